@@ -1,22 +1,33 @@
 """
 Ceramic Glaze Designer — Web Application
 """
-import sys, os, json
-
-# Add parent directory so we can import glaze_engine and glaze_designer
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-from flask import Flask, request, jsonify, send_from_directory
+import sys, os, json, re, hashlib, shutil, time, uuid
+import urllib.request, urllib.error
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+
+from flask import Flask, Response, request, send_from_directory
+from werkzeug.security import safe_join
 import glaze_engine
 import glaze_designer
 
-app = Flask(__name__, static_folder="static")
+# static_files() below serves /static itself (cache headers, precompressed variants)
+app = Flask(__name__, static_folder=None)
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 3600
+STATIC_DIR = os.path.join(app.root_path, "static")
 
 # Load materials DB once
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "materials_db.json")
-with open(DB_PATH) as f:
-    _raw_db = json.load(f)
-MATERIALS_DB = _raw_db["materials"]
+with open(DB_PATH, "rb") as f:
+    _raw_db = json.loads(f.read())
+# Interned so names parsed from the reference files share these key objects
+# Never modified after load, so the engine may cache its lookup tables
+MATERIALS_DB = glaze_engine.mark_read_only(
+    {sys.intern(name): mat for name, mat in _raw_db["materials"].items()}
+)
+_MATERIALS_KEYS = frozenset(MATERIALS_DB)
 
 CLAY_BODY_OPTIONS = [
     {"id": "nz_6", "name": "NZ 6 Porcelain", "cone": "5-6", "cte": 55.0, "color": "White"},
@@ -91,6 +102,28 @@ REFERENCE_GLAZES = [
 ]
 
 
+# Lookup tables for describe_glaze
+_DESCRIBE_FLUXES = ("CaO", "Na2O", "K2O", "MgO", "ZnO", "SrO", "BaO", "Li2O", "B2O3")
+_FLUX_NAMES = {"CaO":"calcium","Na2O":"sodium","K2O":"potassium","MgO":"magnesia",
+               "ZnO":"zinc","SrO":"strontium","BaO":"barium","Li2O":"lithium","B2O3":"boron"}
+# (oxide, UMF threshold, note) — noted when the oxide exceeds the threshold
+_FLUX_NOTES = (
+    ("ZnO", 0.15, "High zinc oxide promotes matte/crystalline surfaces and can create interesting textural effects."),
+    ("MgO", 0.15, "Significant magnesia contributes a buttery, smooth matte surface quality."),
+    ("B2O3", 0.15, "Boron flux helps the glaze melt at lower temperatures and promotes a smooth, healed surface."),
+    ("SrO", 0.1, "Strontium gives a warmer, smoother quality than calcium — often preferred for subtle color responses."),
+    ("Na2O", 0.25, "High sodium — expect high thermal expansion (potential crazing) and vivid color response from colorants."),
+)
+_COLORANT_MAP = {
+    "Red Iron Oxide": ("iron", "Fe2O3"), "Cobalt Carbonate": ("cobalt", "CoO"),
+    "Cobalt Oxide": ("cobalt", "CoO"), "Copper Carbonate": ("copper", "CuO"),
+    "Copper Oxide": ("copper", "CuO"), "Chrome Oxide": ("chrome", "Cr2O3"),
+    "Manganese Dioxide": ("manganese", "MnO"), "Rutile": ("rutile/titanium", "TiO2"),
+    "Tin Oxide": ("tin", "SnO2"), "Titanium Dioxide": ("titanium", "TiO2"),
+    "Zircopax": ("zirconium", "ZrO2"), "Silicon Carbide": ("silicon carbide", None),
+}
+
+
 def describe_glaze(recipe_dict, umf, limits, cte, food_safety):
     """Generate a human-readable description of a glaze from its analysis."""
     lines = []
@@ -111,30 +144,23 @@ def describe_glaze(recipe_dict, umf, limits, cte, food_safety):
     else:
         surface = "matte"
     
-    # Dominant flux
-    fluxes = {k: umf.get(k, 0) for k in ["CaO","Na2O","K2O","MgO","ZnO","SrO","BaO","Li2O","B2O3"]}
-    top_flux = max(fluxes, key=fluxes.get) if fluxes else "CaO"
-    flux_names = {"CaO":"calcium","Na2O":"sodium","K2O":"potassium","MgO":"magnesia",
-                  "ZnO":"zinc","SrO":"strontium","BaO":"barium","Li2O":"lithium","B2O3":"boron"}
+    # Dominant flux (first in _DESCRIBE_FLUXES wins ties)
+    get = umf.get
+    top_flux, top_val = "CaO", get("CaO", 0)
+    for ox in _DESCRIBE_FLUXES:
+        val = get(ox, 0)
+        if val > top_val:
+            top_flux, top_val = ox, val
     
     # Colorants in recipe
-    colorant_map = {
-        "Red Iron Oxide": ("iron", "Fe2O3"), "Cobalt Carbonate": ("cobalt", "CoO"),
-        "Cobalt Oxide": ("cobalt", "CoO"), "Copper Carbonate": ("copper", "CuO"),
-        "Copper Oxide": ("copper", "CuO"), "Chrome Oxide": ("chrome", "Cr2O3"),
-        "Manganese Dioxide": ("manganese", "MnO"), "Rutile": ("rutile/titanium", "TiO2"),
-        "Tin Oxide": ("tin", "SnO2"), "Titanium Dioxide": ("titanium", "TiO2"),
-        "Zircopax": ("zirconium", "ZrO2"), "Silicon Carbide": ("silicon carbide", None),
-    }
-    colorants_found = []
-    for mat in recipe_dict:
-        if mat in colorant_map:
-            total = sum(recipe_dict.values())
-            pct = recipe_dict[mat] / total * 100 if total else 0
-            colorants_found.append((colorant_map[mat][0], pct))
+    total = sum(recipe_dict.values())
+    colorants_found = [
+        (_COLORANT_MAP[mat][0], amt / total * 100 if total else 0)
+        for mat, amt in recipe_dict.items() if mat in _COLORANT_MAP
+    ]
     
     # Build description
-    lines.append(f"This is a **{surface}** glaze with a **{flux_names.get(top_flux, top_flux)}-dominant** flux system.")
+    lines.append(f"This is a **{surface}** glaze with a **{_FLUX_NAMES.get(top_flux, top_flux)}-dominant** flux system.")
     
     # Silica/alumina commentary
     if si < 2.5:
@@ -148,16 +174,7 @@ def describe_glaze(recipe_dict, umf, limits, cte, food_safety):
         lines.append(f"Low alumina ({al:.2f}) — this glaze will be very fluid. Watch for running off vertical surfaces.")
     
     # Flux commentary
-    if fluxes.get("ZnO", 0) > 0.15:
-        lines.append("High zinc oxide promotes matte/crystalline surfaces and can create interesting textural effects.")
-    if fluxes.get("MgO", 0) > 0.15:
-        lines.append("Significant magnesia contributes a buttery, smooth matte surface quality.")
-    if fluxes.get("B2O3", 0) > 0.15:
-        lines.append("Boron flux helps the glaze melt at lower temperatures and promotes a smooth, healed surface.")
-    if fluxes.get("SrO", 0) > 0.1:
-        lines.append("Strontium gives a warmer, smoother quality than calcium — often preferred for subtle color responses.")
-    if fluxes.get("Na2O", 0) > 0.25:
-        lines.append("High sodium — expect high thermal expansion (potential crazing) and vivid color response from colorants.")
+    lines.extend(note for ox, limit, note in _FLUX_NOTES if get(ox, 0) > limit)
     
     # Colorant commentary
     if colorants_found:
@@ -205,73 +222,178 @@ def describe_glaze(recipe_dict, umf, limits, cte, food_safety):
     return " ".join(lines)
 
 
+def build_recipe_table(recipe, total=None, grams_ndigits=2):
+    """
+    Build the [{material, percent, grams}] rows shown in the UI, largest first.
+
+    `total` defaults to the recipe's own sum; pass the base-recipe total to
+    express colorant additions as a percentage of the base batch.
+    """
+    if total is None:
+        total = sum(recipe.values())
+    rows = sorted(recipe.items(), key=itemgetter(1), reverse=True)
+    if not total:
+        return [{"material": mat, "percent": 0, "grams": round(amt, grams_ndigits)} for mat, amt in rows]
+    return [
+        {"material": mat, "percent": round(amt / total * 100, 1), "grams": round(amt, grams_ndigits)}
+        for mat, amt in rows
+    ]
+
+
+RecipeChemistry = namedtuple("RecipeChemistry", "umf limits cte food_safety")
+
+
+@lru_cache(maxsize=4096)
+def _recipe_chemistry(recipe_key):
+    recipe = dict(recipe_key)
+    umf = glaze_engine.recipe_to_umf(recipe, MATERIALS_DB)
+    return RecipeChemistry(
+        umf=umf,
+        limits=glaze_engine.check_limits(umf),
+        cte=glaze_engine.thermal_expansion(umf),
+        food_safety=glaze_engine.food_safety_check(recipe, umf),
+    )
+
+
+def recipe_chemistry(recipe_dict):
+    """
+    Memoized UMF, limit check, CTE and food-safety bundle for a recipe.
+
+    Keyed on the recipe's items in insertion order, since material order sets
+    the floating-point summation order. The returned objects are shared
+    between calls — copy before mutating.
+    """
+    return _recipe_chemistry(tuple(recipe_dict.items()))
+
+
+@lru_cache(maxsize=512)
+def _recipe_analysis(recipe_key, value_types):
+    # value_types keeps 40 and 40.0 apart: they hash alike but serialize differently
+    recipe_dict = dict(recipe_key)
+    umf, limits, cte, food_safety = _recipe_chemistry(recipe_key)
+
+    dry_total = sum(recipe_dict.values())
+    recipe_table = build_recipe_table(recipe_dict, dry_total)
+
+    description = describe_glaze(recipe_dict, umf, limits, cte, food_safety)
+
+    # Water recommendation for mixing
+    # Target specific gravity ~1.45-1.50 for dipping glazes
+    # SG = (dry + water) / (dry/2.5 + water)  where 2.5 is avg powder density
+    # For SG=1.45: water = dry * (2.5 - 1.45) / (1.45 * (2.5 - 1))
+    # Simplified: ~70-80% water by weight of dry materials for SG ~1.45-1.50
+    water_for_dip = round(dry_total * 0.75, 0)  # ~SG 1.47
+    water_for_spray = round(dry_total * 0.95, 0)  # thinner, ~SG 1.35
+    water_rec = {
+        "dipping": {"water_g": water_for_dip, "sg": 1.47, "note": "Standard dipping consistency"},
+        "spraying": {"water_g": water_for_spray, "sg": 1.35, "note": "Thinner for spray application"},
+        "note": f"For {dry_total:.0f}g dry materials. Adjust to preference — start thick, add water gradually. Always measure with a hydrometer if available."
+    }
+
+    return {
+        "recipe_table": recipe_table,
+        "umf": {k: round(v, 4) for k, v in umf.items()},
+        "limits": limits,
+        "cte": cte,
+        "food_safety": food_safety,
+        "description": description,
+        "water": water_rec,
+    }
+
+
 def analyze_recipe(recipe_dict):
-    """Common analysis logic for a recipe dict {material: percent}."""
+    """
+    Common analysis logic for a recipe dict {material: percent}.
+
+    The recipe-dependent part is memoized; each call gets a fresh top-level
+    dict, but the nested values are shared — replace them, don't mutate them.
+    """
     # Validate materials
-    missing = [m for m in recipe_dict if m not in MATERIALS_DB]
+    missing = recipe_dict.keys() - _MATERIALS_KEYS
     if missing:
+        missing = [m for m in recipe_dict if m in missing]  # keep the user's order
         return {"success": False, "error": f"Unknown materials: {', '.join(missing)}. Check spelling."}
 
     try:
-        umf = glaze_engine.recipe_to_umf(recipe_dict, MATERIALS_DB)
-        limits = glaze_engine.check_limits(umf)
-        cte = glaze_engine.thermal_expansion(umf)
-        food_safety = glaze_engine.food_safety_check(recipe_dict, umf)
-
-        total = sum(recipe_dict.values())
-        recipe_table = []
-        for mat, amt in sorted(recipe_dict.items(), key=lambda x: -x[1]):
-            recipe_table.append({"material": mat, "percent": round(amt / total * 100, 1) if total else 0, "grams": round(amt, 2)})
-
-        description = describe_glaze(recipe_dict, umf, limits, cte, food_safety)
-
-        # Water recommendation for mixing
-        # Target specific gravity ~1.45-1.50 for dipping glazes
-        # SG = (dry + water) / (dry/2.5 + water)  where 2.5 is avg powder density
-        # For SG=1.45: water = dry * (2.5 - 1.45) / (1.45 * (2.5 - 1))
-        # Simplified: ~70-80% water by weight of dry materials for SG ~1.45-1.50
-        dry_total = sum(recipe_dict.values())
-        water_for_dip = round(dry_total * 0.75, 0)  # ~SG 1.47
-        water_for_spray = round(dry_total * 0.95, 0)  # thinner, ~SG 1.35
-        water_rec = {
-            "dipping": {"water_g": water_for_dip, "sg": 1.47, "note": "Standard dipping consistency"},
-            "spraying": {"water_g": water_for_spray, "sg": 1.35, "note": "Thinner for spray application"},
-            "note": f"For {dry_total:.0f}g dry materials. Adjust to preference — start thick, add water gradually. Always measure with a hydrometer if available."
-        }
-
-        return {
-            "success": True,
-            "recipe": recipe_dict,
-            "recipe_table": recipe_table,
-            "umf": {k: round(v, 4) for k, v in umf.items()},
-            "limits": limits,
-            "cte": cte,
-            "food_safety": food_safety,
-            "description": description,
-            "water": water_rec,
-        }
+        analysis = _recipe_analysis(tuple(recipe_dict.items()), tuple(map(type, recipe_dict.values())))
+        return {"success": True, "recipe": recipe_dict, **analysis}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 @app.route("/")
 def index():
-    return send_from_directory("static", "index.html")
+    # The page itself always revalidates so a deploy is picked up immediately
+    return send_from_directory(STATIC_DIR, "index.html", max_age=0)
+
+
+# (Content-Encoding, file suffix), in order of preference
+_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
 
 
 @app.route("/static/<path:path>")
 def static_files(path):
-    return send_from_directory("static", path)
+    full = safe_join(STATIC_DIR, path)
+    if full is not None and os.path.isfile(full):
+        for coding, suffix in _PRECOMPRESSED:
+            # Only use a variant at least as new as its source, so a stale .gz never wins
+            if request.accept_encodings[coding] and os.path.isfile(full + suffix) \
+                    and os.path.getmtime(full + suffix) >= os.path.getmtime(full):
+                resp = send_from_directory(STATIC_DIR, path + suffix, download_name=os.path.basename(path))
+                resp.headers["Content-Encoding"] = coding
+                resp.vary.add("Accept-Encoding")
+                return resp
+    resp = send_from_directory(STATIC_DIR, path)
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def _dump_json(obj):
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _json_response(obj):
+    """Serialize an API payload compactly, skipping Flask's key sorting."""
+    return Response(_dump_json(obj), mimetype="application/json")
+
+
+def _static_json(obj):
+    """Serialize a startup-constant payload once, with a content-hash ETag."""
+    payload = _dump_json(obj)
+    return payload, hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def _cached_json_response(payload, etag):
+    resp = Response(payload, mimetype="application/json")
+    resp.set_etag(etag)
+    # Data only changes on restart, so let clients revalidate hourly via the ETag
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 3600
+    return resp.make_conditional(request)
+
+
+_MATERIALS_JSON, _MATERIALS_ETAG = _static_json(sorted(MATERIALS_DB.keys()))
+_CLAY_BODIES_JSON, _CLAY_BODIES_ETAG = _static_json(CLAY_BODY_OPTIONS)
 
 
 @app.route("/api/materials")
 def get_materials():
-    return jsonify(sorted(MATERIALS_DB.keys()))
+    return _cached_json_response(_MATERIALS_JSON, _MATERIALS_ETAG)
 
 
 @app.route("/api/clay-bodies")
 def get_clay_bodies():
-    return jsonify(CLAY_BODY_OPTIONS)
+    return _cached_json_response(_CLAY_BODIES_JSON, _CLAY_BODIES_ETAG)
+
+
+def _read_json(path):
+    """Parse a JSON file straight from bytes; None if it doesn't exist."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return json.loads(data)
 
 
 def load_all_references():
@@ -293,18 +415,15 @@ def load_all_references():
     
     # 2. Digitalfire recipes
     df_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "digitalfire_recipes.json")
-    if os.path.exists(df_path):
-        with open(df_path) as f:
-            df_recipes = json.load(f)
+    df_recipes = _read_json(df_path)
+    if df_recipes is not None:
         for r in df_recipes:
-            recipe_dict = {}
-            for m in r.get("materials", []):
-                recipe_dict[m["name"]] = m["percent"]
+            recipe_dict = {sys.intern(m["name"]): m["percent"] for m in r.get("materials", ())}
             all_refs.append({
                 "name": f"{r.get('code', '')} — {r.get('name', '')}".strip(" —"),
                 "source": "digitalfire",
                 "cone": str(r.get("cone", "6")),
-                "surface": r.get("surface", ""),
+                "surface": sys.intern(r.get("surface", "")),
                 "description": r.get("notes", "")[:120] if r.get("notes") else "",
                 "recipe": recipe_dict,
                 "additions": {},
@@ -313,17 +432,16 @@ def load_all_references():
     
     # 3. Glazy recipes
     gl_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "glazy_recipes.json")
-    if os.path.exists(gl_path):
-        with open(gl_path) as f:
-            gl_recipes = json.load(f)
+    gl_recipes = _read_json(gl_path)
+    if gl_recipes is not None:
         for r in gl_recipes:
             recipe_dict = {}
             additions_dict = {}
-            for m in r.get("materials", []):
+            for m in r.get("materials", ()):
                 if m.get("is_additional"):
-                    additions_dict[m["name"]] = m["percent"]
+                    additions_dict[sys.intern(m["name"])] = m["percent"]
                 else:
-                    recipe_dict[m["name"]] = m["percent"]
+                    recipe_dict[sys.intern(m["name"])] = m["percent"]
             surface = r.get("surface", "")
             color = r.get("color", "")
             label = f"{surface} {color}".strip() if surface or color else ""
@@ -331,7 +449,7 @@ def load_all_references():
                 "name": r.get("name", "Unnamed"),
                 "source": "glazy",
                 "cone": str(r.get("cone", "6")),
-                "surface": surface.lower() if surface else "",
+                "surface": sys.intern(surface.lower()) if surface else "",
                 "description": label,
                 "recipe": recipe_dict,
                 "additions": additions_dict,
@@ -343,45 +461,159 @@ def load_all_references():
     return all_refs
 
 ALL_REFERENCES = load_all_references()
-
-@app.route("/api/references")
-def get_references():
-    source = request.args.get("source", "all")
-    surface = request.args.get("surface", "all")
-    refs = ALL_REFERENCES
+for _i, _ref in enumerate(ALL_REFERENCES):
+    _ref["id"] = _i
+
+# Listing fields only; notes, recipes and links come from /api/references/<id>
+_REF_SUMMARIES = [
+    {"id": r["id"], "name": r["name"], "source": r["source"], "cone": r.get("cone"),
+     "surface": r.get("surface"), "description": r.get("description", "")}
+    for r in ALL_REFERENCES
+]
+_REF_VIEWS = {"full": ALL_REFERENCES, "summary": _REF_SUMMARIES}
+
+# Columnar copies of the two filter fields, so filtering never touches the full records
+_REF_SOURCES = [r.get("source") for r in ALL_REFERENCES]
+_REF_SURFACES = [r.get("surface", "").lower() for r in ALL_REFERENCES]
+
+
+def _build_reference_indexes(sources, surfaces):
+    """
+    Index reference positions by source and by surface key.
+
+    Surface keys are each distinct lowercased surface value plus its word
+    tokens; each maps to every reference whose surface *contains* the key,
+    so index hits agree exactly with the substring filter.
+    """
+    source_index = {}
+    for i, src in enumerate(sources):
+        source_index.setdefault(src, []).append(i)
+
+    keys = set()
+    for sf in surfaces:
+        if sf:
+            keys.add(sf)
+            keys.update(t for t in re.split(r"[^a-z]+", sf) if t)
+    surface_index = {k: [i for i, sf in enumerate(surfaces) if k in sf] for k in keys}
+    return source_index, surface_index
+
+
+def _index_masks(index):
+    """Pack each index entry into an int bitmask (bit i set = reference i matches)."""
+    masks = {}
+    for key, ids in index.items():
+        mask = 0
+        for i in ids:
+            mask |= 1 << i
+        masks[key] = mask
+    return masks
+
+
+def _mask_ids(mask):
+    """Set-bit positions of `mask`, ascending."""
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+_SOURCE_INDEX, _SURFACE_INDEX = _build_reference_indexes(_REF_SOURCES, _REF_SURFACES)
+_SOURCE_MASK = _index_masks(_SOURCE_INDEX)
+_SURFACE_MASK = _index_masks(_SURFACE_INDEX)
+
+
+def _filter_reference_ids(source="all", surface="all"):
+    """Positions in ALL_REFERENCES matching the source and surface-substring filters."""
+    ids = range(len(ALL_REFERENCES))
     if source != "all":
-        refs = [r for r in refs if r.get("source") == source]
+        ids = _SOURCE_INDEX.get(source, [])
     if surface != "all":
-        refs = [r for r in refs if surface in r.get("surface", "").lower()]
-    return jsonify(refs)
+        surface_ids = _SURFACE_INDEX.get(surface)
+        if surface_ids is None:
+            # Not an indexed key — scan the surface column
+            ids = [i for i in ids if surface in _REF_SURFACES[i]]
+        elif source == "all":
+            ids = surface_ids
+        else:
+            ids = _mask_ids(_SOURCE_MASK.get(source, 0) & _SURFACE_MASK[surface])
+    return ids
 
 
-@app.route("/api/design", methods=["POST"])
-def design():
-    data = request.json or {}
+def filter_references(source="all", surface="all"):
+    """Filter the reference library by source and surface substring."""
+    if source == "all" and surface == "all":
+        return ALL_REFERENCES
+    return [ALL_REFERENCES[i] for i in _filter_reference_ids(source, surface)]
+
+
+def _stream_references(ids, records=ALL_REFERENCES):
+    """Yield a JSON array of the given references one record at a time."""
+    sep = b"["
+    for i in ids:
+        # One chunk per record: separator and body go out in the same write
+        yield sep + _dump_json(records[i])
+        sep = b","
+    yield b"]" if sep == b"," else b"[]"
+
+
+def _build_reference_cache():
+    """Pre-serialize every (view, source, surface) filter the library data can answer."""
+    sources = ["all"] + sorted(_SOURCE_INDEX)
+    surfaces = ["all"] + sorted(_SURFACE_INDEX)
+    return {(view, src, sf): _static_json([records[i] for i in _filter_reference_ids(src, sf)])
+            for view, records in _REF_VIEWS.items()
+            for src in sources for sf in surfaces}
+
+
+# The library is immutable after startup, so filtered payloads are encoded once
+_REF_CACHE = _build_reference_cache()
+
+
+@app.route("/api/references")
+def get_references():
+    view = request.args.get("view", "full")
+    records = _REF_VIEWS.get(view)
+    if records is None:
+        return _json_response({"success": False, "error": f"Unknown view: {view}"}), 400
+    # Library sources and surfaces are lowercase; normalize so mixed-case queries hit the cache
+    source = request.args.get("source", "all").lower()
+    surface = request.args.get("surface", "all").lower()
+    cached = _REF_CACHE.get((view, source, surface))
+    if cached is not None:
+        return _cached_json_response(*cached)
+    # Arbitrary substring queries aren't worth caching; stream them instead
+    return Response(_stream_references(_filter_reference_ids(source, surface), records),
+                    mimetype="application/json")
+
+
+@app.route("/api/references/<int:ref_id>")
+def get_reference(ref_id):
+    if ref_id >= len(ALL_REFERENCES):
+        return _json_response({"success": False, "error": "Reference not found"}), 404
+    return _json_response(ALL_REFERENCES[ref_id])
+
+
+def _design_core(data):
     description = data.get("description", "")
     clay_body = data.get("clay_body")
     if not description:
-        return jsonify({"success": False, "error": "Please provide a glaze description."})
+        return {"success": False, "error": "Please provide a glaze description."}
 
     try:
         result = glaze_designer.design_glaze(description, clay_body=clay_body)
 
         if not result.get("success"):
-            return jsonify(result)
+            return result
 
         # Build recipe table
         recipe = result["recipe"]
         total = sum(recipe.values())
-        recipe_table = []
-        for mat, amt in sorted(recipe.items(), key=lambda x: -x[1]):
-            recipe_table.append({"material": mat, "percent": round(amt / total * 100, 1), "grams": round(amt, 2)})
+        recipe_table = build_recipe_table(recipe, total)
 
         # Colorant additions table
-        additions_table = []
-        if result.get("colorant_additions"):
-            for mat, amt in sorted(result["colorant_additions"].items(), key=lambda x: -x[1]):
-                additions_table.append({"material": mat, "grams": round(amt, 2), "percent": round(amt / total * 100, 1)})
+        additions_table = build_recipe_table(result.get("colorant_additions") or {}, total)
 
         # CTE fit info
         cte_info = {"value": result["cte"]}
@@ -390,7 +622,7 @@ def design():
         if result.get("crazing_note"):
             cte_info["note"] = result["crazing_note"]
 
-        return jsonify({
+        return {
             "success": True,
             "recipe": result["recipe"],
             "recipe_table": recipe_table,
@@ -404,18 +636,18 @@ def design():
             "ingredient_explanations": result.get("ingredient_explanations", ""),
             "notes": result.get("notes", []),
             "parsed": result.get("parsed", {}),
-        })
+        }
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)})
+        return {"success": False, "error": str(e)}
 
 
-@app.route("/api/analyze", methods=["POST"])
-def analyze():
-    data = request.json or {}
+def _analyze_core(data):
     recipe = data.get("recipe", {})
     clay_body = data.get("clay_body")
     if not recipe:
-        return jsonify({"success": False, "error": "Please provide a recipe."})
+        return {"success": False, "error": "Please provide a recipe."}
+    if not isinstance(recipe, dict):
+        return {"success": False, "error": "Recipe must be an object of {material: amount}."}
 
     result = analyze_recipe(recipe)
 
@@ -437,12 +669,10 @@ def analyze():
     elif result.get("success"):
         result["cte"] = {"value": result["cte"]}
 
-    return jsonify(result)
+    return result
 
 
-@app.route("/api/variation", methods=["POST"])
-def variation():
-    data = request.json or {}
+def _variation_core(data):
     recipe = data.get("recipe", {})
     direction = data.get("direction", "")
     description = data.get("description", "")
@@ -450,11 +680,11 @@ def variation():
     parsed = data.get("parsed", {})
 
     if not recipe or not direction:
-        return jsonify({"success": False, "error": "Provide recipe and direction."})
+        return {"success": False, "error": "Provide recipe and direction."}
 
     # Build a base_result-like dict for suggest_variations
     try:
-        umf = glaze_engine.recipe_to_umf(recipe, MATERIALS_DB)
+        umf = recipe_chemistry(recipe).umf
         base_result = {
             "success": True,
             "description": description or "base",
@@ -470,17 +700,12 @@ def variation():
         result = glaze_designer.suggest_variations(base_result, direction)
 
         if not result.get("success"):
-            return jsonify(result)
+            return result
 
         recipe_out = result["recipe"]
         total = sum(recipe_out.values())
-        recipe_table = [{"material": m, "percent": round(a / total * 100, 1), "grams": round(a, 2)}
-                        for m, a in sorted(recipe_out.items(), key=lambda x: -x[1])]
-
-        additions_table = []
-        if result.get("colorant_additions"):
-            for mat, amt in sorted(result["colorant_additions"].items(), key=lambda x: -x[1]):
-                additions_table.append({"material": mat, "grams": round(amt, 2), "percent": round(amt / total * 100, 1)})
+        recipe_table = build_recipe_table(recipe_out, total)
+        additions_table = build_recipe_table(result.get("colorant_additions") or {}, total)
 
         cte_info = {"value": result["cte"]}
         if result.get("body_cte"):
@@ -488,7 +713,7 @@ def variation():
         if result.get("crazing_note"):
             cte_info["note"] = result["crazing_note"]
 
-        return jsonify({
+        return {
             "success": True,
             "recipe": result["recipe"],
             "recipe_table": recipe_table,
@@ -499,45 +724,146 @@ def variation():
             "food_safety": result.get("food_safety", []),
             "explanation": result.get("explanation", []),
             "notes": result.get("notes", []),
-        })
+        }
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)})
+        return {"success": False, "error": str(e)}
 
 
-@app.route("/api/scale", methods=["POST"])
-def scale():
-    data = request.json or {}
+def _scale_core(data):
     recipe = data.get("recipe", {})
     target_weight = data.get("target_weight", 1000)
     if not recipe:
-        return jsonify({"success": False, "error": "Provide a recipe."})
+        return {"success": False, "error": "Provide a recipe."}
 
     scaled = glaze_engine.scale_recipe(recipe, target_weight)
     total = sum(scaled.values())
-    table = [{"material": m, "grams": round(a, 1), "percent": round(a / total * 100, 1)}
-             for m, a in sorted(scaled.items(), key=lambda x: -x[1])]
-    return jsonify({"success": True, "recipe": scaled, "recipe_table": table, "total_weight": round(total, 1)})
+    table = build_recipe_table(scaled, total, grams_ndigits=1)
+    return {"success": True, "recipe": scaled, "recipe_table": table, "total_weight": round(total, 1)}
 
 
-@app.route("/api/generate-image", methods=["POST"])
-def generate_image():
-    import urllib.request, urllib.error
-    OPENAI_KEY = os.environ.get("OPENAI_API_KEY", "")
-    # Also check a local .env file
-    if not OPENAI_KEY:
-        env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
-        if os.path.exists(env_path):
-            for line in open(env_path):
-                if line.startswith('OPENAI_API_KEY='):
-                    OPENAI_KEY = line.split('=', 1)[1].strip()
-    if not OPENAI_KEY:
-        return jsonify({"success": False, "message": "Set OPENAI_API_KEY in .env file to enable image generation."})
-    data = request.get_json() or {}
-    description = data.get("description", "")
-    recipe_summary = data.get("recipe_summary", "")
-    if not description:
-        return jsonify({"success": False, "message": "No description provided."})
+@app.route("/api/design", methods=["POST"])
+def design():
+    return _json_response(_design_core(request.json or {}))
+
+
+@app.route("/api/analyze", methods=["POST"])
+def analyze():
+    return _json_response(_analyze_core(request.json or {}))
+
+
+@app.route("/api/variation", methods=["POST"])
+def variation():
+    return _json_response(_variation_core(request.json or {}))
+
+
+@app.route("/api/scale", methods=["POST"])
+def scale():
+    return _json_response(_scale_core(request.json or {}))
+
+
+_BATCH_OPS = {
+    "design": _design_core,
+    "analyze": _analyze_core,
+    "variation": _variation_core,
+    "scale": _scale_core,
+}
+_BATCH_MAX_OPS = 20  # each op may run an uncached solve
+
+
+@app.route("/api/batch", methods=["POST"])
+def batch():
+    """
+    Run several design/analyze/variation/scale calls in one round trip.
+
+    Body: {"ops": [{"op": "analyze", "args": {...}}, ...]} — each `args` is
+    the JSON body the single endpoint takes. A missing or non-list `ops`, or
+    more than _BATCH_MAX_OPS of them, is a 400. Repeated recipes share the
+    memoized chemistry. Returns {"success": true, "results": [...]} in order.
+    """
+    data = request.json or {}
+    ops = data.get("ops")
+    if not isinstance(ops, list):
+        return _json_response({"success": False, "error": "Provide a list of ops."}), 400
+    if len(ops) > _BATCH_MAX_OPS:
+        return _json_response({"success": False, "error": f"At most {_BATCH_MAX_OPS} ops per batch."}), 400
+
+    results = []
+    for entry in ops:
+        entry = entry if isinstance(entry, dict) else {}
+        core = _BATCH_OPS.get(entry.get("op"))
+        if core is None:
+            results.append({"success": False, "error": f"Unknown op: {entry.get('op')!r}"})
+            continue
+        try:
+            results.append(core(entry.get("args") or {}))
+        except Exception as e:
+            results.append({"success": False, "error": str(e)})
+    return _json_response({"success": True, "results": results})
+
+
+def _load_dotenv():
+    """Copy KEY=value lines from a local .env into os.environ; non-empty env vars win."""
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return
+    for line in lines:
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if sep and key and not key.startswith("#") and not os.environ.get(key):
+            os.environ[key] = value.strip()
 
+
+_load_dotenv()
+
+
+# Image generation takes up to ~90s (DALL-E call + download), so it runs on a
+# small thread pool. Job state lives on disk so any gunicorn worker can answer a poll.
+_SAVED_GLAZES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saved_glazes")
+_IMAGE_JOBS_DIR = os.path.join(_SAVED_GLAZES_DIR, "jobs")
+_IMAGE_POOL = ThreadPoolExecutor(max_workers=4)
+_IMAGE_JOB_TIMEOUT = 120  # s; urlopen timeouts (60 + 30) plus slack
+_IMAGE_JOB_TTL = 3600  # s; finished job files are kept this long for re-polls
+_JOB_ID_RE = re.compile(r"[0-9a-f]{32}")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _write_image_job(job_id, state):
+    os.makedirs(_IMAGE_JOBS_DIR, exist_ok=True)
+    path = os.path.join(_IMAGE_JOBS_DIR, f"{job_id}.json")
+    with open(path + ".tmp", "wb") as f:
+        f.write(_dump_json(state))
+    os.replace(path + ".tmp", path)  # pollers never see a half-written file
+
+
+def _sweep_image_jobs():
+    cutoff = time.time() - _IMAGE_JOB_TTL
+    try:
+        names = os.listdir(_IMAGE_JOBS_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(_IMAGE_JOBS_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # another worker got there first
+
+
+def _run_image_job(job_id, api_key, data, description, recipe_summary):
+    # Touch the pending file so time spent queued doesn't count toward the timeout
+    _write_image_job(job_id, {"success": True, "status": "pending"})
+    try:
+        result = _generate_image(api_key, data, description, recipe_summary)
+    except Exception as e:
+        result = {"success": False, "message": str(e)}
+    _write_image_job(job_id, {"status": "done", **result})
+
+
+def _generate_image(api_key, data, description, recipe_summary):
+    """Call DALL-E for a test-tile preview and save it with its recipe card."""
     prompt = (
         f"A photograph of a small vertical ceramic glaze test tile showing: {description}. "
         "The test tile is a small rectangular piece of stoneware clay, about 3 inches tall, "
@@ -563,7 +889,7 @@ def generate_image():
         data=payload,
         headers={
             "Content-Type": "application/json",
-            "Authorization": f"Bearer {OPENAI_KEY}"
+            "Authorization": f"Bearer {api_key}"
         }
     )
     try:
@@ -575,16 +901,15 @@ def generate_image():
         # Auto-save image locally
         saved_path = ""
         try:
-            save_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saved_glazes")
+            save_dir = _SAVED_GLAZES_DIR
             os.makedirs(save_dir, exist_ok=True)
-            import re, time
-            slug = re.sub(r'[^a-z0-9]+', '-', description.lower().strip())[:60].strip('-')
+            slug = _SLUG_RE.sub('-', description.lower().strip())[:60].strip('-')
             ts = time.strftime("%Y%m%d-%H%M%S")
             img_name = f"{ts}_{slug}.png"
             img_path = os.path.join(save_dir, img_name)
             with urllib.request.urlopen(image_url, timeout=30) as img_resp:
                 with open(img_path, 'wb') as f:
-                    f.write(img_resp.read())
+                    shutil.copyfileobj(img_resp, f, 65536)
 
             # Save recipe card alongside
             recipe_html = data.get("recipe_html", "")
@@ -620,17 +945,52 @@ def generate_image():
         except Exception as save_err:
             print(f"Warning: could not save image locally: {save_err}")
 
-        return jsonify({"success": True, "image_url": image_url, "revised_prompt": revised_prompt, "saved_path": saved_path})
+        return {"success": True, "image_url": image_url, "revised_prompt": revised_prompt, "saved_path": saved_path}
     except urllib.error.HTTPError as e:
         body = e.read().decode() if e.fp else ""
         try:
             err_msg = json.loads(body).get("error", {}).get("message", body)
         except Exception:
             err_msg = body
-        return jsonify({"success": False, "message": f"OpenAI error: {err_msg}"}), 500
+        return {"success": False, "message": f"OpenAI error: {err_msg}"}
     except Exception as e:
-        return jsonify({"success": False, "message": str(e)}), 500
+        return {"success": False, "message": str(e)}
+
+
+@app.route("/api/generate-image", methods=["POST"])
+def generate_image():
+    OPENAI_KEY = os.environ.get("OPENAI_API_KEY", "")
+    if not OPENAI_KEY:
+        return _json_response({"success": False, "message": "Set OPENAI_API_KEY in .env file to enable image generation."})
+    data = request.get_json() or {}
+    description = data.get("description", "")
+    recipe_summary = data.get("recipe_summary", "")
+    if not description:
+        return _json_response({"success": False, "message": "No description provided."})
+
+    _sweep_image_jobs()
+    job_id = uuid.uuid4().hex
+    _write_image_job(job_id, {"success": True, "status": "pending"})
+    _IMAGE_POOL.submit(_run_image_job, job_id, OPENAI_KEY, data, description, recipe_summary)
+    return _json_response({"success": True, "status": "pending", "job_id": job_id}), 202
+
+
+@app.route("/api/generate-image/<job_id>")
+def generate_image_status(job_id):
+    path = os.path.join(_IMAGE_JOBS_DIR, f"{job_id}.json")
+    state = _read_json(path) if _JOB_ID_RE.fullmatch(job_id) else None
+    if state is None:
+        return _json_response({"success": False, "message": "Unknown image job."}), 404
+    if state.get("status") == "pending":
+        try:
+            stale = time.time() - os.path.getmtime(path) > _IMAGE_JOB_TIMEOUT
+        except OSError:
+            stale = False
+        if stale:
+            # The worker running it was restarted or died
+            state = {"success": False, "status": "done", "message": "Image job timed out."}
+    return _json_response(state)
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app.run(host="0.0.0.0", port=5000, debug=os.environ.get("FLASK_DEBUG") == "1")
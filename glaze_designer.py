@@ -5,10 +5,13 @@ Natural-language interface on top of glaze_engine.py.
 Cone 6 oxidation focus.
 """
 
+import copy
 import re
+from functools import lru_cache
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
 from glaze_engine import (
-    load_materials_db,
+    _default_materials_db,
     recipe_to_umf,
     umf_to_recipe,
     check_limits,
@@ -17,6 +20,8 @@ from glaze_engine import (
     format_umf,
     format_limit_check,
     CONE6_LIMITS,
+    FLUX_OXIDES,
+    COLORANT_OXIDES,
 )
 
 # ── Surface type targets ──────────────────────────────────────────────────
@@ -82,6 +87,10 @@ FLUX_PRESETS = {
     },
 }
 
+# Range midpoints, used as design_glaze's target UMF
+_SURFACE_MIDPOINTS = {k: {ox: (lo + hi) / 2.0 for ox, (lo, hi) in v.items()} for k, v in SURFACE_TARGETS.items()}
+_FLUX_MIDPOINTS = {k: {ox: (lo + hi) / 2.0 for ox, (lo, hi) in v.items()} for k, v in FLUX_PRESETS.items()}
+
 # ── Color systems (additions as wt% of base recipe batch) ────────────────
 
 COLOR_SYSTEMS = {
@@ -143,22 +152,37 @@ COLOR_SYSTEMS = {
     },
 }
 
+# Flattened for design_glaze: {key: (((material, wt%), ...), notes)}
+_COLOR_ADDITIONS = {k: (tuple(v["additions"].items()), v["notes"]) for k, v in COLOR_SYSTEMS.items()}
+
 # ── Material selection for different flux systems ─────────────────────────
 
-BASE_MATERIALS = [
+# Tuples: hashable, so solver calls can be memoized on (target, materials)
+BASE_MATERIALS = (
     "Custer Feldspar", "Nepheline Syenite", "EPK Kaolin",
     "Silica", "Whiting", "Bentonite",
-]
+)
 
 FLUX_MATERIALS = {
     "default":       BASE_MATERIALS,
-    "buttery_matte": BASE_MATERIALS + ["Dolomite", "Talc"],
-    "silky_matte":   BASE_MATERIALS + ["Wollastonite"],
-    "zinc_matte":    BASE_MATERIALS + ["Zinc Oxide"],
-    "boron_gloss":   BASE_MATERIALS + ["Ferro Frit 3134"],
-    "crystalline":   ["Ferro Frit 3110", "Silica", "Zinc Oxide", "EPK Kaolin"],
+    "buttery_matte": BASE_MATERIALS + ("Dolomite", "Talc"),
+    "silky_matte":   BASE_MATERIALS + ("Wollastonite",),
+    "zinc_matte":    BASE_MATERIALS + ("Zinc Oxide",),
+    "boron_gloss":   BASE_MATERIALS + ("Ferro Frit 3134",),
+    "crystalline":   ("Ferro Frit 3110", "Silica", "Zinc Oxide", "EPK Kaolin"),
+}
+
+# Fallback pool when a flux system's own materials can't hit the target
+_BROAD_MATERIALS = {
+    key: tuple(set(BASE_MATERIALS + mats + ("Ferro Frit 3134", "Dolomite", "Talc", "Wollastonite", "Zinc Oxide")))
+    for key, mats in FLUX_MATERIALS.items()
 }
 
+# Flux systems whose own materials never reach any design target (checked
+# across every preset/surface/effect combination) — designs solve broad directly.
+# Variations still try the palette first: client recipes give arbitrary targets
+_ALWAYS_BROAD = frozenset({"buttery_matte", "silky_matte", "boron_gloss", "crystalline"})
+
 # ── Clay body CTE estimates (×10⁻⁷/°C) ──────────────────────────────────
 
 CLAY_BODIES = {
@@ -170,6 +194,27 @@ CLAY_BODIES = {
 }
 
 
+@lru_cache(maxsize=1024)
+def _solve_recipe_cached(target_key: Tuple[Tuple[str, float], ...], materials: Tuple[str, ...]) -> Optional[Dict[str, float]]:
+    return umf_to_recipe(dict(target_key), materials, _default_materials_db())
+
+
+def _solve_recipe(target_umf: Dict[str, float], materials: Tuple[str, ...]) -> Optional[Dict[str, float]]:
+    """Memoized umf_to_recipe against the default database; returns a fresh dict."""
+    # Keyed in insertion order — oxide order fixes the solver's row order
+    recipe = _solve_recipe_cached(tuple(target_umf.items()), materials)
+    return None if recipe is None else dict(recipe)
+
+
+def _normalize_fluxes(target_umf: Dict[str, float]) -> None:
+    """Scale the flux oxides present in `target_umf` (in place) to sum to 1.0."""
+    fluxes = [f for f in FLUX_OXIDES if f in target_umf]
+    flux_sum = sum(target_umf[f] for f in fluxes)
+    if flux_sum > 0:
+        for f in fluxes:
+            target_umf[f] /= flux_sum
+
+
 # ══════════════════════════════════════════════════════════════════════════
 # Description parser
 # ══════════════════════════════════════════════════════════════════════════
@@ -301,8 +346,20 @@ def design_glaze(description: str, clay_body: Optional[str] = None) -> dict:
 
     Returns dict with: recipe, umf, limits, expansion, food_safety, 
                        colorant_additions, explanation, notes
+
+    Results are memoized on the normalized description and clay body; each
+    call gets its own deep copy, so callers may mutate it freely.
     """
-    db = load_materials_db()
+    result = copy.deepcopy(_design_glaze(description.lower().strip(), clay_body))
+    if "description" in result:
+        result["description"] = description
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _design_glaze(description: str, clay_body: Optional[str]) -> dict:
+    # `description` arrives lowercased and stripped — all parse_description looks at
+    db = _default_materials_db()
     parsed = parse_description(description)
     if clay_body:
         parsed["clay_body"] = clay_body
@@ -312,16 +369,11 @@ def design_glaze(description: str, clay_body: Optional[str] = None) -> dict:
                        f"flux={parsed['flux_system']}, colors={parsed['colors']}, "
                        f"effects={parsed['effects']}")
 
-    # Build target UMF from surface + flux system
-    surface = SURFACE_TARGETS.get(parsed["surface"], SURFACE_TARGETS["glossy"])
-    flux = FLUX_PRESETS.get(parsed["flux_system"], FLUX_PRESETS["default"])
-
-    # Use midpoints of ranges as target
-    target_umf = {}
-    for oxide, (lo, hi) in flux.items():
-        target_umf[oxide] = (lo + hi) / 2.0
-    for oxide, (lo, hi) in surface.items():
-        target_umf[oxide] = (lo + hi) / 2.0
+    # Build target UMF from surface + flux system midpoints (surface wins on overlap)
+    target_umf = {
+        **_FLUX_MIDPOINTS.get(parsed["flux_system"], _FLUX_MIDPOINTS["default"]),
+        **_SURFACE_MIDPOINTS.get(parsed["surface"], _SURFACE_MIDPOINTS["glossy"]),
+    }
 
     # Apply special effects to target UMF
     if "intentional_crazing" in parsed["effects"]:
@@ -342,12 +394,7 @@ def design_glaze(description: str, clay_body: Optional[str] = None) -> dict:
         explanation.append("Boosted alumina for stability — glaze will resist running")
 
     # Normalize fluxes to sum to 1.0
-    from glaze_engine import FLUX_OXIDES
-    flux_sum = sum(target_umf.get(f, 0) for f in FLUX_OXIDES)
-    if flux_sum > 0:
-        for f in FLUX_OXIDES:
-            if f in target_umf:
-                target_umf[f] /= flux_sum
+    _normalize_fluxes(target_umf)
 
     explanation.append(f"Target UMF midpoints (flux-normalized): "
                        + ", ".join(f"{k}={v:.3f}" for k, v in sorted(target_umf.items())))
@@ -359,11 +406,11 @@ def design_glaze(description: str, clay_body: Optional[str] = None) -> dict:
     materials = FLUX_MATERIALS.get(flux_key, BASE_MATERIALS)
 
     # Solve
-    recipe = umf_to_recipe(target_umf, materials, db)
+    recipe = None if flux_key in _ALWAYS_BROAD else _solve_recipe(target_umf, materials)
     if recipe is None:
         # Try with broader material set
-        broad = list(set(BASE_MATERIALS + materials + ["Ferro Frit 3134", "Dolomite", "Talc", "Wollastonite", "Zinc Oxide"]))
-        recipe = umf_to_recipe(target_umf, broad, db)
+        broad = _BROAD_MATERIALS.get(flux_key, _BROAD_MATERIALS["default"])
+        recipe = _solve_recipe(target_umf, broad)
         if recipe is None:
             return {
                 "success": False,
@@ -384,17 +431,16 @@ def design_glaze(description: str, clay_body: Optional[str] = None) -> dict:
     batch_total = sum(recipe.values())
 
     for color_key in parsed["colors"] + parsed["effects"]:
-        cs = COLOR_SYSTEMS.get(color_key)
-        if cs:
-            for mat, pct in cs["additions"].items():
+        cs = _COLOR_ADDITIONS.get(color_key)
+        if cs is not None:
+            additions, note = cs
+            for mat, pct in additions:
                 amt = round(batch_total * pct / 100.0, 2)
                 colorant_additions[mat] = colorant_additions.get(mat, 0) + amt
-            color_notes.append(cs["notes"])
+            color_notes.append(note)
 
     # Food safety
-    full_recipe = dict(recipe)
-    full_recipe.update(colorant_additions)
-    food_safety = food_safety_check(full_recipe, umf)
+    food_safety = food_safety_check({**recipe, **colorant_additions}, umf)
 
     # Expansion fit
     body_cte = None
@@ -433,82 +479,6 @@ def design_glaze(description: str, clay_body: Optional[str] = None) -> dict:
     }
 
 
-# ══════════════════════════════════════════════════════════════════════════
-# Ingredient explanations
-# ══════════════════════════════════════════════════════════════════════════
-
-MATERIAL_ROLES = {
-    "Nepheline Syenite": ("flux + glass former", "Supplies sodium and potassium (fluxes) plus silica and alumina. Melts at lower temperatures than feldspar, making it ideal for mid-fire."),
-    "Custer Feldspar": ("flux + glass former", "Potassium feldspar — supplies K₂O flux plus silica and alumina. Workhorse material for building glaze structure."),
-    "Ferro Frit 3134": ("flux (boron + calcium)", "Pre-melted glass frit high in boron and calcium. Reliable flux that promotes smooth, healed surfaces and helps the glaze melt evenly."),
-    "Ferro Frit 3124": ("flux (boron + calcium + alumina)", "Balanced boron frit with alumina. Less fluid than 3134, better for vertical surfaces."),
-    "Ferro Frit 3110": ("flux (sodium + boron)", "High-sodium boron frit. Promotes bright color response from colorants."),
-    "Silica": ("glass former", "Pure SiO₂ — the primary glass-building oxide. More silica = harder, more durable, more glossy. Also reduces thermal expansion (less crazing)."),
-    "EPK Kaolin": ("alumina + suspension", "Supplies Al₂O₃ (controls melt viscosity) and keeps the glaze from running off the pot. Also helps the raw glaze stay suspended in the bucket."),
-    "Ball Clay": ("alumina + suspension + plasticity", "Similar to kaolin but finer particle size. Better suspension, adds slight color from impurities."),
-    "Whiting": ("calcium flux", "Calcium carbonate — the most common high-fire flux. Promotes durability and a hard, scratch-resistant surface."),
-    "Wollastonite": ("calcium flux (low LOI)", "Calcium silicate — supplies CaO like whiting but with less gas release during firing. Reduces crawling and pinholing."),
-    "Dolomite": ("calcium + magnesia flux", "Supplies both CaO and MgO. The magnesia contributes to smooth, buttery matte surfaces."),
-    "Talc": ("magnesia flux", "Supplies MgO — promotes matte surfaces with a smooth, silky feel. Also helps lower thermal expansion."),
-    "Strontium Carbonate": ("strontium flux", "Alternative to calcium with a warmer, smoother quality. Gives softer color response and can improve glaze fit on some bodies."),
-    "Zinc Oxide": ("zinc flux", "Promotes crystalline and matte effects. Can create dramatic visual texture. High amounts may cause food safety concerns."),
-    "Gerstley Borate": ("boron flux", "Natural source of boron — powerful flux that helps glazes melt. Can be inconsistent batch-to-batch."),
-    "Lithium Carbonate": ("lithium flux", "Powerful low-expansion flux. A little goes a long way. Promotes bright colors and fluid melts."),
-    "Barium Carbonate": ("barium flux", "Promotes matte surfaces and certain blue effects. Toxic in raw form — must be fully incorporated into the glaze melt."),
-    "Spodumene": ("lithium flux + silica", "Lithium mineral — supplies Li₂O, Al₂O₃, and SiO₂. Low-expansion flux source."),
-    "Bone Ash": ("phosphorus", "Tricalcium phosphate — promotes opalescence, chun blue effects, and crystal nucleation."),
-    "Red Iron Oxide": ("colorant", "Iron — the most versatile ceramic colorant. Low % = amber/cream, medium = brown, high = black/metallic crystals."),
-    "Cobalt Carbonate": ("colorant", "The strongest blue colorant. Even 0.5% gives noticeable blue. More = deeper, darker blue."),
-    "Cobalt Oxide": ("colorant", "Concentrated cobalt — about 1.4x stronger than the carbonate form."),
-    "Copper Carbonate": ("colorant", "Green in oxidation, red in reduction. In high-alkali glazes, shifts toward turquoise/blue."),
-    "Chrome Oxide": ("colorant", "Strong green colorant. Can react with tin oxide to produce pink (chrome-tin pink)."),
-    "Manganese Dioxide": ("colorant", "Purple-brown colorant. Often combined with cobalt and iron for blacks."),
-    "Rutile": ("colorant + texture", "Titanium mineral with iron impurities. Creates variegation, breaking, and streaking effects. The go-to material for visual movement in a glaze."),
-    "Tin Oxide": ("opacifier", "Classic white opacifier. Also serves as crystal nucleation sites in crystalline/micro-crystalline glazes."),
-    "Titanium Dioxide": ("opacifier + texture", "White opacifier that can also create matte surfaces and crystal effects at higher percentages."),
-    "Zircopax": ("opacifier", "Zirconium silicate — strong, stable white opacifier. More predictable than tin oxide."),
-    "Bentonite": ("suspension agent", "Highly plastic clay added in small amounts to keep the glaze suspended in the bucket. Does not significantly affect fired chemistry."),
-    "Silicon Carbide": ("reducing agent", "Creates localized reduction inside an oxidation kiln by releasing CO gas. Used for faux celadon and luster effects."),
-}
-
-def build_ingredient_explanations(recipe, colorant_additions, parsed, umf):
-    """Build human-readable explanations of why each ingredient is in the recipe."""
-    lines = []
-    surface = parsed.get("surface", "glossy")
-    colors = parsed.get("colors", [])
-    effects = parsed.get("effects", [])
-    
-    # Sort by amount descending
-    all_mats = sorted(recipe.items(), key=lambda x: -x[1])
-    
-    lines.append(f"This recipe is built to achieve a **{surface}** surface" + 
-                 (f" with **{', '.join(colors + effects)}**." if (colors or effects) else "."))
-    lines.append("")
-    
-    for mat, amt in all_mats:
-        total = sum(recipe.values())
-        pct = amt / total * 100 if total else 0
-        role_info = MATERIAL_ROLES.get(mat)
-        if role_info:
-            role, desc = role_info
-            lines.append(f"**{mat}** ({pct:.0f}%) — _{role}_ — {desc}")
-        else:
-            lines.append(f"**{mat}** ({pct:.0f}%)")
-    
-    if colorant_additions:
-        lines.append("")
-        lines.append("**Colorant & effect additions:**")
-        for mat, amt in sorted(colorant_additions.items(), key=lambda x: -x[1]):
-            role_info = MATERIAL_ROLES.get(mat)
-            if role_info:
-                role, desc = role_info
-                lines.append(f"**+ {mat}** — _{role}_ — {desc}")
-            else:
-                lines.append(f"**+ {mat}**")
-    
-    return "\n".join(lines)
-
-
 # ══════════════════════════════════════════════════════════════════════════
 # Ingredient-level explanations
 # ══════════════════════════════════════════════════════════════════════════
@@ -549,6 +519,73 @@ MATERIAL_ROLES = {
     "Silicon Carbide": "Creates localized reduction in oxidation kilns — CO2 bubbles reduce nearby iron/copper. Used for faux celadon and foam effects.",
 }
 
+# Per-material "why it's here" rules: (applies(surface, flux_system, colors,
+# effects, pct), context) — first match wins. {surface} is filled in on use.
+_MAGNESIA_CONTEXT_RULES = (
+    (lambda sf, fx, cl, ef, pct: sf in ("matte", "buttery_matte"),
+     "Chosen specifically for the {surface} surface you requested — magnesia is key to that buttery feel."),
+)
+_FRIT_CONTEXT_RULES = (
+    (lambda sf, fx, cl, ef, pct: fx == "boron_gloss",
+     "Boron frit provides the smooth, self-healing gloss surface."),
+)
+MATERIAL_CONTEXT_RULES = {
+    "Dolomite": _MAGNESIA_CONTEXT_RULES,
+    "Talc": _MAGNESIA_CONTEXT_RULES,
+    "Zinc Oxide": (
+        (lambda sf, fx, cl, ef, pct: sf == "zinc_matte" or sf == "crystalline",
+         "High zinc drives the crystalline/matte texture you described."),
+    ),
+    "Whiting": (
+        (lambda sf, fx, cl, ef, pct: pct > 12,
+         "High calcium — the primary flux driving this glaze's melt and durability."),
+    ),
+    "Strontium Carbonate": (
+        (lambda sf, fx, cl, ef, pct: pct > 3,
+         "Strontium chosen over calcium for warmer tone and enhanced color response."),
+    ),
+    "Nepheline Syenite": (
+        (lambda sf, fx, cl, ef, pct: pct > 40,
+         "Dominant material — provides most of the flux, alumina, and silica in a single ingredient."),
+    ),
+    "Silica": (
+        (lambda sf, fx, cl, ef, pct: pct > 15,
+         "High silica for durability and to balance the flux ratio."),
+    ),
+    # Colorants
+    "Red Iron Oxide": (
+        (lambda sf, fx, cl, ef, pct: "tenmoku" in cl or "saturated_iron" in cl,
+         "High iron for the dark, rich surface with potential crystal formation."),
+        (lambda sf, fx, cl, ef, pct: "celadon" in cl,
+         "Light iron wash — in the right base, this gives a subtle green-blue reminiscent of celadon."),
+        (lambda sf, fx, cl, ef, pct: "iron_amber" in cl or "iron_brown" in cl,
+         "Iron for warm amber-to-brown coloring."),
+    ),
+    "Cobalt Carbonate": (
+        (lambda sf, fx, cl, ef, pct: "cobalt_blue" in cl,
+         "The blue you asked for — cobalt is the most reliable blue at any temperature."),
+    ),
+    "Copper Carbonate": (
+        (lambda sf, fx, cl, ef, pct: "copper_green" in cl,
+         "Copper for the green — will be bright green in this oxidation base."),
+    ),
+    "Manganese Dioxide": (
+        (lambda sf, fx, cl, ef, pct: "manganese_purple" in cl,
+         "Combined with cobalt, manganese produces the purple/violet color you asked for."),
+        (lambda sf, fx, cl, ef, pct: True,
+         "Manganese for brown-purple tones."),
+    ),
+    "Rutile": (
+        (lambda sf, fx, cl, ef, pct: "rutile_variegation" in ef,
+         "This is what creates the variegation/breaking effect you described."),
+    ),
+    "Silicon Carbide": (
+        (lambda sf, fx, cl, ef, pct: True,
+         "Creates micro-bubbles of CO gas during firing — this is what produces the foam/reduction texture."),
+    ),
+}
+
+
 def build_ingredient_explanations(recipe, colorant_additions, parsed, umf):
     """Generate explanations for why each ingredient is in the recipe."""
     explanations = []
@@ -570,43 +607,12 @@ def build_ingredient_explanations(recipe, colorant_additions, parsed, umf):
         role = MATERIAL_ROLES.get(mat, "")
         
         # Add context for why this specific material was chosen for this glaze
+        rules = MATERIAL_CONTEXT_RULES.get(mat) or (_FRIT_CONTEXT_RULES if "Frit" in mat else ())
         context = ""
-        if mat in ("Dolomite", "Talc") and surface in ("matte", "buttery_matte"):
-            context = f"Chosen specifically for the {surface.replace('_', ' ')} surface you requested — magnesia is key to that buttery feel."
-        elif mat == "Zinc Oxide" and (surface == "zinc_matte" or surface == "crystalline"):
-            context = "High zinc drives the crystalline/matte texture you described."
-        elif "Frit" in mat and flux_sys == "boron_gloss":
-            context = "Boron frit provides the smooth, self-healing gloss surface."
-        elif mat == "Whiting" and info["pct"] > 12:
-            context = "High calcium — the primary flux driving this glaze's melt and durability."
-        elif mat == "Strontium Carbonate" and info["pct"] > 3:
-            context = "Strontium chosen over calcium for warmer tone and enhanced color response."
-        elif mat == "Nepheline Syenite" and info["pct"] > 40:
-            context = "Dominant material — provides most of the flux, alumina, and silica in a single ingredient."
-        elif mat == "Silica" and info["pct"] > 15:
-            context = "High silica for durability and to balance the flux ratio."
-        
-        # Colorant context
-        if mat == "Red Iron Oxide":
-            if any(c in colors for c in ["tenmoku", "saturated_iron"]):
-                context = "High iron for the dark, rich surface with potential crystal formation."
-            elif "celadon" in colors:
-                context = "Light iron wash — in the right base, this gives a subtle green-blue reminiscent of celadon."
-            elif any(c in colors for c in ["iron_amber", "iron_brown"]):
-                context = "Iron for warm amber-to-brown coloring."
-        elif mat == "Cobalt Carbonate" and "cobalt_blue" in colors:
-            context = "The blue you asked for — cobalt is the most reliable blue at any temperature."
-        elif mat == "Copper Carbonate" and "copper_green" in colors:
-            context = "Copper for the green — will be bright green in this oxidation base."
-        elif mat == "Manganese Dioxide":
-            if "manganese_purple" in colors:
-                context = "Combined with cobalt, manganese produces the purple/violet color you asked for."
-            else:
-                context = "Manganese for brown-purple tones."
-        elif mat == "Rutile" and "rutile_variegation" in effects:
-            context = "This is what creates the variegation/breaking effect you described."
-        elif mat == "Silicon Carbide":
-            context = "Creates micro-bubbles of CO gas during firing — this is what produces the foam/reduction texture."
+        for applies, text in rules:
+            if applies(surface, flux_sys, colors, effects, info["pct"]):
+                context = text.format(surface=surface.replace("_", " "))
+                break
         
         entry = {"material": mat, "role": role}
         if context:
@@ -623,7 +629,7 @@ def build_ingredient_explanations(recipe, colorant_additions, parsed, umf):
 VARIATION_ADJUSTMENTS = {
     "more matte": {"Al2O3": -0.03, "SiO2": -0.3, "MgO": 0.05},
     "more glossy": {"Al2O3": 0.03, "SiO2": 0.4, "MgO": -0.03},
-    "more blue": {},  # handled via colorant
+    "more blue": {},  # handled via VARIATION_COLORANTS
     "reduce crazing": {"Na2O": -0.03, "K2O": -0.02, "SiO2": 0.3},
     "more fluid": {"SiO2": -0.3, "B2O3": 0.05, "CaO": 0.03},
     "more durable": {"Al2O3": 0.03, "SiO2": 0.2},
@@ -631,6 +637,12 @@ VARIATION_ADJUSTMENTS = {
 }
 
 
+# Colorant additions (wt%) for directions mentioning the phrase
+VARIATION_COLORANTS = {
+    "more blue": {"Cobalt Carbonate": 0.5},
+}
+
+
 def suggest_variations(base_result: dict, direction: str) -> dict:
     """
     Adjust a base recipe in a given direction and re-solve.
@@ -650,56 +662,53 @@ def suggest_variations(base_result: dict, direction: str) -> dict:
     if not base_result.get("success"):
         return {"success": False, "error": "Cannot vary a failed recipe"}
 
-    db = load_materials_db()
+    db = _default_materials_db()
     base_umf = base_result["umf"]
     direction_lower = direction.lower().strip()
 
     adjustments = VARIATION_ADJUSTMENTS.get(direction_lower, {})
 
-    # Build new target
-    target = dict(base_umf)
-    # Remove colorant oxides from target (they come from additions)
-    from glaze_engine import COLORANT_OXIDES
-    for ox in COLORANT_OXIDES:
-        target.pop(ox, None)
-
-    for oxide, delta in adjustments.items():
-        target[oxide] = max(0, target.get(oxide, 0) + delta)
-
     # Handle colorant-based directions
     new_color_additions = dict(base_result.get("colorant_additions", {}))
-    if "more blue" in direction_lower:
-        new_color_additions["Cobalt Carbonate"] = new_color_additions.get("Cobalt Carbonate", 0) + 0.5
+    for phrase, deltas in VARIATION_COLORANTS.items():
+        if phrase in direction_lower:
+            for mat, delta in deltas.items():
+                new_color_additions[mat] = new_color_additions.get(mat, 0) + delta
+
+    if not adjustments and direction_lower in VARIATION_ADJUSTMENTS:
+        # Colorant-only direction — the target would be the base UMF, so keep the base recipe
+        recipe = dict(base_result["recipe"])
+        umf = dict(base_umf)
+    else:
+        # Build new target, minus colorant oxides (they come from additions)
+        target = {ox: v for ox, v in base_umf.items() if ox not in COLORANT_OXIDES}
 
-    # Re-normalize fluxes
-    from glaze_engine import FLUX_OXIDES
-    flux_sum = sum(target.get(f, 0) for f in FLUX_OXIDES)
-    if flux_sum > 0:
-        for f in FLUX_OXIDES:
-            if f in target:
-                target[f] /= flux_sum
-
-    # Determine materials from base
-    parsed = base_result.get("parsed", {})
-    flux_key = parsed.get("flux_system", "default")
-    if parsed.get("surface") == "crystalline":
-        flux_key = "crystalline"
-    materials = FLUX_MATERIALS.get(flux_key, BASE_MATERIALS)
+        for oxide, delta in adjustments.items():
+            target[oxide] = max(0, target.get(oxide, 0) + delta)
 
-    recipe = umf_to_recipe(target, materials, db)
-    if recipe is None:
-        broad = list(set(BASE_MATERIALS + materials + ["Ferro Frit 3134", "Dolomite", "Talc", "Wollastonite", "Zinc Oxide"]))
-        recipe = umf_to_recipe(target, broad, db)
+        # Re-normalize fluxes
+        _normalize_fluxes(target)
+
+        # Determine materials from base
+        parsed = base_result.get("parsed", {})
+        flux_key = parsed.get("flux_system", "default")
+        if parsed.get("surface") == "crystalline":
+            flux_key = "crystalline"
+        materials = FLUX_MATERIALS.get(flux_key, BASE_MATERIALS)
+
+        recipe = _solve_recipe(target, materials)
         if recipe is None:
-            return {"success": False, "error": f"Could not solve variation '{direction}'"}
+            broad = _BROAD_MATERIALS.get(flux_key, _BROAD_MATERIALS["default"])
+            recipe = _solve_recipe(target, broad)
+            if recipe is None:
+                return {"success": False, "error": f"Could not solve variation '{direction}'"}
+
+        umf = recipe_to_umf(recipe, db)
 
-    umf = recipe_to_umf(recipe, db)
     limits = check_limits(umf)
     cte = thermal_expansion(umf)
 
-    full_recipe = dict(recipe)
-    full_recipe.update(new_color_additions)
-    food_safety = food_safety_check(full_recipe, umf)
+    food_safety = food_safety_check({**recipe, **new_color_additions}, umf)
 
     body_cte = base_result.get("body_cte")
     crazing_note = None
@@ -752,13 +761,13 @@ def format_result(result: dict) -> str:
     lines.append(f"  {'Material':<25s} {'Grams':>8s}  {'%':>6s}")
     lines.append("  " + "-" * 42)
     total = sum(result["recipe"].values())
-    for mat, amt in sorted(result["recipe"].items(), key=lambda x: -x[1]):
+    for mat, amt in sorted(result["recipe"].items(), key=itemgetter(1), reverse=True):
         lines.append(f"  {mat:<25s} {amt:8.2f}  {amt/total*100:6.1f}%")
     lines.append(f"  {'TOTAL':<25s} {total:8.2f}")
 
     if result.get("colorant_additions"):
         lines.append("\n🎨 COLORANT ADDITIONS (on top of base):")
-        for mat, amt in sorted(result["colorant_additions"].items(), key=lambda x: -x[1]):
+        for mat, amt in sorted(result["colorant_additions"].items(), key=itemgetter(1), reverse=True):
             pct = amt / total * 100
             lines.append(f"  + {mat:<23s} {amt:8.2f}  ({pct:.1f}%)")
 
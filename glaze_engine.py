@@ -10,6 +10,8 @@ Core calculations for cone 6 oxidation glaze formulation:
 
 import json
 import os
+import threading
+from operator import sub
 from typing import Dict, List, Optional, Tuple
 
 # ---------------------------------------------------------------------------
@@ -99,11 +101,93 @@ def load_materials_db(path: Optional[str] = None) -> dict:
     """Load and return the materials database from JSON."""
     if path is None:
         path = os.path.join(os.path.dirname(__file__), "materials_db.json")
-    with open(path) as f:
-        data = json.load(f)
+    with open(path, "rb") as f:
+        data = json.loads(f.read())
     return data["materials"]
 
 
+_DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "materials_db.json")
+_DEFAULT_DB_CACHE: Dict[str, Tuple[int, dict]] = {}
+
+
+def _default_materials_db() -> dict:
+    """
+    The bundled database for callers that pass ``materials_db=None``.
+
+    Parsed once and reused until the file's mtime changes; shared between
+    calls, so treat it as read-only (load_materials_db() returns a fresh copy).
+    """
+    mtime = os.stat(_DEFAULT_DB_PATH).st_mtime_ns
+    entry = _DEFAULT_DB_CACHE.get(_DEFAULT_DB_PATH)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+    db = mark_read_only(load_materials_db(_DEFAULT_DB_PATH))
+    with _CACHE_LOCK:
+        if entry is not None:
+            _READ_ONLY_DBS.pop(id(entry[1]), None)
+        _DEFAULT_DB_CACHE[_DEFAULT_DB_PATH] = (mtime, db)
+    return db
+
+
+# ---------------------------------------------------------------------------
+# Per-database lookup tables
+# ---------------------------------------------------------------------------
+# Tables derived from a database are only cached for databases promised not
+# to change: the bundled default and any passed to mark_read_only(). Others
+# get fresh tables on every call, so callers may edit their dicts freely.
+_READ_ONLY_DBS: Dict[int, dict] = {}  # id -> db; holding the db pins its id
+_CACHE_LOCK = threading.Lock()
+
+
+def mark_read_only(materials_db: dict) -> dict:
+    """
+    Promise that `materials_db` will not be modified from now on.
+
+    recipe_to_umf and umf_to_recipe then cache the lookup tables they derive
+    from it instead of rebuilding them per call. Returns the database.
+    """
+    with _CACHE_LOCK:
+        _READ_ONLY_DBS[id(materials_db)] = materials_db
+    return materials_db
+
+
+def _is_read_only(materials_db: dict) -> bool:
+    return _READ_ONLY_DBS.get(id(materials_db)) is materials_db
+
+
+def _cache_put(cache: dict, size: int, key, value) -> None:
+    """Insert into a bounded first-in-first-out cache; safe across threads."""
+    with _CACHE_LOCK:
+        while len(cache) >= size:
+            cache.pop(next(iter(cache)), None)
+        cache[key] = value
+
+
+_MATERIAL_INDEX_CACHE: Dict[int, Tuple[dict, Dict[str, Tuple[Tuple[str, float], ...]]]] = {}
+_MATERIAL_INDEX_CACHE_SIZE = 4
+
+
+def _material_index(materials_db: dict) -> Dict[str, Tuple[Tuple[str, float], ...]]:
+    """
+    Return {material: ((oxide, wt_pct), ...)} restricted to tracked oxides.
+
+    Cached for read-only databases so per-call conversion is a flat tuple
+    walk; built fresh for any other database.
+    """
+    cacheable = _is_read_only(materials_db)
+    if cacheable:
+        entry = _MATERIAL_INDEX_CACHE.get(id(materials_db))
+        if entry is not None and entry[0] is materials_db:
+            return entry[1]
+    index = {
+        name: tuple((ox, pct) for ox, pct in mat.get("oxides", {}).items() if ox in OXIDE_MW)
+        for name, mat in materials_db.items()
+    }
+    if cacheable:
+        _cache_put(_MATERIAL_INDEX_CACHE, _MATERIAL_INDEX_CACHE_SIZE, id(materials_db), (materials_db, index))
+    return index
+
+
 # ---------------------------------------------------------------------------
 # recipe_to_umf
 # ---------------------------------------------------------------------------
@@ -119,7 +203,8 @@ def recipe_to_umf(
     recipe : dict
         {material_name: weight_amount} — does NOT need to sum to 100.
     materials_db : dict, optional
-        Materials database (loaded from JSON if not provided).
+        Materials database (the bundled one if not provided). Lookup tables
+        are rebuilt per call unless it was passed to mark_read_only().
 
     Returns
     -------
@@ -127,26 +212,22 @@ def recipe_to_umf(
         {oxide: moles} normalized so that RO/R2O fluxes sum to 1.0.
     """
     if materials_db is None:
-        materials_db = load_materials_db()
+        materials_db = _default_materials_db()
 
-    # Step 1: Accumulate oxide weights from all materials
+    # Step 1: Accumulate oxide weights from all materials.
+    # The index already drops oxides we don't track (SnO2, ZrO2 etc.)
+    index = _material_index(materials_db)
     oxide_weights: Dict[str, float] = {}
-    total_weight = sum(recipe.values())
 
     for material_name, amount in recipe.items():
-        mat = materials_db.get(material_name)
-        if mat is None:
+        oxides = index.get(material_name)
+        if oxides is None:
             raise KeyError(f"Material '{material_name}' not found in database")
-        for oxide, wt_pct in mat.get("oxides", {}).items():
+        for oxide, wt_pct in oxides:
             oxide_weights[oxide] = oxide_weights.get(oxide, 0.0) + amount * wt_pct / 100.0
 
     # Step 2: Convert weights to moles
-    oxide_moles: Dict[str, float] = {}
-    for oxide, weight in oxide_weights.items():
-        mw = OXIDE_MW.get(oxide)
-        if mw is None:
-            continue  # skip oxides we don't track (SnO2, ZrO2 etc.)
-        oxide_moles[oxide] = weight / mw
+    oxide_moles = {oxide: weight / OXIDE_MW[oxide] for oxide, weight in oxide_weights.items()}
 
     # Step 3: Normalize — fluxes sum to 1.0
     flux_total = sum(oxide_moles.get(f, 0.0) for f in FLUX_OXIDES)
@@ -154,11 +235,7 @@ def recipe_to_umf(
         # Can't normalize; return raw moles
         return oxide_moles
 
-    umf = {}
-    for oxide, moles in oxide_moles.items():
-        umf[oxide] = moles / flux_total
-
-    return umf
+    return {oxide: moles / flux_total for oxide, moles in oxide_moles.items()}
 
 
 # ---------------------------------------------------------------------------
@@ -175,9 +252,10 @@ def check_limits(
     status is 'ok', 'low', or 'high'.
     """
     limits = CONE6_LIMITS  # only cone 6 implemented
+    get = umf.get
     results = []
     for oxide, (lo, hi) in limits.items():
-        val = umf.get(oxide, 0.0)
+        val = get(oxide, 0.0)
         if val < lo - 1e-9:
             status = "low"
         elif val > hi + 1e-9:
@@ -208,10 +286,10 @@ def thermal_expansion(umf: Dict[str, float]) -> float:
     if total_moles <= 0:
         return 0.0
 
+    coeff = THERMAL_EXPANSION_COEFFICIENTS.get
     cte = 0.0
     for oxide, moles in umf.items():
-        coeff = THERMAL_EXPANSION_COEFFICIENTS.get(oxide, 0.0)
-        cte += coeff * (moles / total_moles)
+        cte += coeff(oxide, 0.0) * (moles / total_moles)
     return round(cte, 1)
 
 
@@ -260,7 +338,6 @@ def food_safety_check(
         warnings.append(f"⚠️  Nickel oxide present — toxic, not food-safe")
 
     # Recipe-based checks
-    recipe_lower = {k.lower(): v for k, v in recipe.items()}
     total = sum(recipe.values())
     for name, amount in recipe.items():
         pct = amount / total * 100 if total > 0 else 0
@@ -294,6 +371,44 @@ def scale_recipe(
 # ---------------------------------------------------------------------------
 # umf_to_recipe (linear programming)
 # ---------------------------------------------------------------------------
+_MATERIAL_MATRIX_CACHE: Dict[Tuple[int, Tuple[str, ...], Tuple[str, ...]], Tuple[dict, Tuple[Tuple[float, ...], ...]]] = {}
+_MATERIAL_MATRIX_CACHE_SIZE = 64
+
+
+def _material_matrix(
+    materials_db: dict,
+    materials: Tuple[str, ...],
+    oxides: Tuple[str, ...],
+) -> Tuple[Tuple[float, ...], ...]:
+    """
+    Return rows M[j][i] = moles of oxide j per gram of material i.
+
+    Only the target amounts change between solves over the same palette and
+    oxide set, so for read-only databases the block is built once per
+    (database, materials, oxides); other databases get a fresh block.
+    """
+    key = (id(materials_db), materials, oxides)
+    cacheable = _is_read_only(materials_db)
+    if cacheable:
+        entry = _MATERIAL_MATRIX_CACHE.get(key)
+        if entry is not None and entry[0] is materials_db:
+            return entry[1]
+
+    # Walk each material's own oxides (most carry only a few target oxides)
+    rows = [[0.0] * len(materials) for _ in oxides]
+    row_of = {ox: j for j, ox in enumerate(oxides)}
+    for i, mat_name in enumerate(materials):
+        for oxide, wt_pct in materials_db[mat_name].get("oxides", {}).items():
+            j = row_of.get(oxide)
+            if j is not None:
+                rows[j][i] = (wt_pct / 100.0) / OXIDE_MW.get(oxide, 1.0)
+    matrix = tuple(map(tuple, rows))
+
+    if cacheable:
+        _cache_put(_MATERIAL_MATRIX_CACHE, _MATERIAL_MATRIX_CACHE_SIZE, key, (materials_db, matrix))
+    return matrix
+
+
 def umf_to_recipe(
     target_umf: Dict[str, float],
     available_materials: List[str],
@@ -310,6 +425,8 @@ def umf_to_recipe(
     available_materials : list
         Material names to use.
     materials_db : dict, optional
+        Materials database (the bundled one if not provided). Lookup tables
+        are rebuilt per call unless it was passed to mark_read_only().
     total_batch : float
         Target total weight for the recipe.
 
@@ -319,7 +436,7 @@ def umf_to_recipe(
         {material_name: weight} or None if infeasible.
     """
     if materials_db is None:
-        materials_db = load_materials_db()
+        materials_db = _default_materials_db()
 
     target_oxides = [ox for ox in target_umf if target_umf[ox] != 0]
     if not target_oxides:
@@ -328,28 +445,14 @@ def umf_to_recipe(
     n_mats = len(available_materials)
     n_ox = len(target_oxides)
 
-    # Build A matrix: moles of oxide j per gram of material i
-    A_eq = [[0.0] * n_mats for _ in range(n_ox)]
-    for i, mat_name in enumerate(available_materials):
-        mat = materials_db[mat_name]
-        for j, oxide in enumerate(target_oxides):
-            wt_pct = mat.get("oxides", {}).get(oxide, 0.0)
-            mw = OXIDE_MW.get(oxide, 1.0)
-            A_eq[j][i] = (wt_pct / 100.0) / mw
-
     # UMF normalization: sum_i(A[j,i]*x[i]) = target[j] * s
     # Variables: x[0..n_mats-1] = material weights, x[n_mats] = s (scale)
     n_vars = n_mats + 1
-    A = [[0.0] * n_vars for _ in range(n_ox)]
-    for j in range(n_ox):
-        for i in range(n_mats):
-            A[j][i] = A_eq[j][i]
-        A[j][n_mats] = -target_umf.get(target_oxides[j], 0.0)
+    matrix = _material_matrix(materials_db, tuple(available_materials), tuple(target_oxides))
+    A = [[*row, -target_umf[ox]] for row, ox in zip(matrix, target_oxides)]
 
     b = [0.0] * n_ox
-    c = [0.0] * n_vars
-    for i in range(n_mats):
-        c[i] = 1.0
+    c = [1.0] * n_mats + [0.0]
 
     result_x = _linprog_simplex(c, A, b, n_vars, lower_bounds=[0.0]*n_mats + [0.001])
 
@@ -414,21 +517,16 @@ def _linprog_simplex(
     # tab[i] = [coeffs..., rhs]
     tab = []
     for i in range(m):
-        row = [0.0] * (total_cols + 1)
-        for j in range(n):
-            row[j] = A_eq[i][j]
+        row = A_eq[i][:n] + [0.0] * (m + 1)
         row[n + i] = 1.0  # artificial
         row[total_cols] = b_shifted[i]
         tab.append(row)
 
     # Objective row for phase 1: min sum of artificials
-    obj = [0.0] * (total_cols + 1)
-    for i in range(m):
-        obj[n + i] = 1.0
+    obj = [0.0] * n + [1.0] * m + [0.0]
     # Subtract basic rows from objective
-    for i in range(m):
-        for j in range(total_cols + 1):
-            obj[j] -= tab[i][j]
+    for row in tab:
+        obj = list(map(sub, obj, row))
     tab.append(obj)
 
     basis = list(range(n, n + m))  # artificial vars are initial basis
@@ -438,45 +536,54 @@ def _linprog_simplex(
         if abs(piv) < 1e-15:
             return False
         inv_piv = 1.0 / piv
+        prow = tab[row]
         for j in range(total_cols + 1):
-            tab[row][j] *= inv_piv
+            prow[j] *= inv_piv
+        # The tableau is mostly zeros (identity block, materials lacking an
+        # oxide) — only columns where the pivot row is nonzero can change
+        nz_cols = [j for j, v in enumerate(prow) if v != 0.0]
         for i in range(m + 1):
             if i == row:
                 continue
-            factor = tab[i][col]
+            r = tab[i]
+            factor = r[col]
             if abs(factor) < 1e-15:
                 continue
-            for j in range(total_cols + 1):
-                tab[i][j] -= factor * tab[row][j]
+            for j in nz_cols:
+                r[j] -= factor * prow[j]
+        return True
+
+    def run_phase():
+        """Pivot until no reduced cost is negative; False if unbounded."""
+        for _ in range(max_iter):
+            # Most negative reduced cost (first one on ties)
+            obj_row = tab[m]
+            min_rc = min(obj_row[:total_cols])
+            if min_rc >= -1e-9:
+                return True  # optimal
+            enter = obj_row.index(min_rc)
+
+            # Min ratio test
+            min_ratio = float('inf')
+            leave = -1
+            for i in range(m):
+                r = tab[i]
+                a = r[enter]
+                if a > 1e-12:
+                    ratio = r[total_cols] / a
+                    if ratio < min_ratio:
+                        min_ratio = ratio
+                        leave = i
+            if leave == -1:
+                return False  # unbounded
+
+            pivot(tab, m, total_cols, leave, enter)
+            basis[leave] = enter
         return True
 
     # Phase 1 simplex
-    for _ in range(max_iter):
-        # Find most negative reduced cost
-        obj_row = tab[m]
-        min_rc = -1e-9
-        enter = -1
-        for j in range(total_cols):
-            if obj_row[j] < min_rc:
-                min_rc = obj_row[j]
-                enter = j
-        if enter == -1:
-            break  # optimal
-
-        # Min ratio test
-        min_ratio = float('inf')
-        leave = -1
-        for i in range(m):
-            if tab[i][enter] > 1e-12:
-                ratio = tab[i][total_cols] / tab[i][enter]
-                if ratio < min_ratio:
-                    min_ratio = ratio
-                    leave = i
-        if leave == -1:
-            return None  # unbounded
-
-        pivot(tab, m, total_cols, leave, enter)
-        basis[leave] = enter
+    if not run_phase():
+        return None
 
     # Check if artificials are zero
     phase1_val = tab[m][total_cols]
@@ -503,30 +610,8 @@ def _linprog_simplex(
                 tab[m][j] -= factor * tab[i][j]
 
     # Phase 2 simplex
-    for _ in range(max_iter):
-        obj_row = tab[m]
-        min_rc = -1e-9
-        enter = -1
-        for j in range(total_cols):
-            if obj_row[j] < min_rc:
-                min_rc = obj_row[j]
-                enter = j
-        if enter == -1:
-            break
-
-        min_ratio = float('inf')
-        leave = -1
-        for i in range(m):
-            if tab[i][enter] > 1e-12:
-                ratio = tab[i][total_cols] / tab[i][enter]
-                if ratio < min_ratio:
-                    min_ratio = ratio
-                    leave = i
-        if leave == -1:
-            return None
-
-        pivot(tab, m, total_cols, leave, enter)
-        basis[leave] = enter
+    if not run_phase():
+        return None
 
     # Extract solution (in y-space)
     y = [0.0] * n
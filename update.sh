@@ -2,5 +2,10 @@
 cd "$(dirname "$0")"
 echo "⏳ Pulling latest code..."
 git pull
+echo "🗜  Precompressing static assets..."
+gzip -kf9 static/*.js static/*.css
+command -v brotli >/dev/null && brotli -kf static/*.js static/*.css
 echo "🏺 Starting Glaze Designer..."
-python3 app.py
+# Pre-forked workers (one per core); the engine is pure-Python CPU work.
+# --preload builds the data caches once before forking.
+exec gunicorn -w "$(nproc 2>/dev/null || echo 2)" -k gthread --threads 4 --preload -b 0.0.0.0:5000 wsgi:app
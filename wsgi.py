@@ -0,0 +1,13 @@
+"""
+Ceramic Glaze Designer — WSGI entry point
+=========================================
+Production servers import `app` from here, e.g.:
+
+    gunicorn -w $(nproc) -k gthread --threads 4 --preload -b 0.0.0.0:5000 wsgi:app
+
+`--preload` imports the app (materials, reference library, response caches)
+once in the master, so forked workers share those pages copy-on-write.
+"""
+from app import app
+
+__all__ = ["app"]